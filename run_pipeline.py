@@ -1,13 +1,14 @@
 # run_pipeline.py
 from zenml import pipeline, get_pipeline_context, log_metadata
 from datetime import datetime
+import argparse
 
 # Import steps from src/pipeline modules
 from src.pipeline.data_preprocess import preprocess_data
 from src.pipeline.train_model import train_model
 
 
-@pipeline(name="iris_classification_pipeline") # set enable_cache=False to disable caching (default: True)
+@pipeline(name="iris_classification_pipeline", enable_cache=True) # set enable_cache=False to disable caching
 def iris_pipeline():
     """
     ZenML pipeline for Iris flower classification.
@@ -27,8 +28,21 @@ def iris_pipeline():
 
 
 if __name__ == "__main__":
-    from zenml.client import Client
-    
+    parser = argparse.ArgumentParser(description="Run the Iris classification pipeline")
+    parser.add_argument(
+        "--setup-stack",
+        action="store_true",
+        help="Register and activate the S3/MinIO stack before running (used by the pipeline-runner container)",
+    )
+    args = parser.parse_args()
+
+    # Configure the stack in this same process so ZenML is only imported once
+    if args.setup_stack:
+        from zenml.client import Client
+        from src.pipeline.zenml_stack import setup_zenml_stack
+
+        setup_zenml_stack(Client())
+
     # Run the pipeline
     run = iris_pipeline()
     
@@ -2,6 +2,7 @@
 set -e
 
 ZENML_URL="${ZENML_STORE_URL:-http://zenml:8080}"
+MLFLOW_URL="${MLFLOW_TRACKING_URI:-http://mlflow:5000}"
 ADMIN_USER="${ZENML_DEFAULT_USER_NAME:-admin}"
 ADMIN_PASS="${ZENML_DEFAULT_USER_PASSWORD:-zenml}"
 SERVICE_ACCOUNT_NAME="pipeline-runner"
@@ -10,19 +11,31 @@ echo "=============================================="
 echo "ZenML Pipeline Runner"
 echo "=============================================="
 
-echo "Waiting for ZenML server to be ready..."
-until curl -s "$ZENML_URL/health" > /dev/null 2>&1; do
-    echo "ZenML server not ready, waiting..."
-    sleep 3
-done
-echo "ZenML server is ready!"
-
-echo "Waiting for MLflow to be ready..."
-until curl -s http://mlflow:5000/ > /dev/null 2>&1; do
-    echo "MLflow not ready, waiting..."
-    sleep 3
-done
-echo "MLflow is ready!"
+# Poll a service URL with HEAD requests until it answers with a non-5xx status,
+# backing off exponentially with jitter (0.25s doubling up to 5s, each sleep
+# randomized to 50-100% of the delay)
+wait_for_service() {
+    local name="$1"
+    local url="$2"
+    local delay_ms=250
+    local sleep_ms
+    local status
+    until status=$(curl -s -o /dev/null -I -w '%{http_code}' "$url") && [ "$status" -lt 500 ]; do
+        echo "$name not ready, waiting..."
+        sleep_ms=$(( delay_ms / 2 + RANDOM % (delay_ms / 2 + 1) ))
+        sleep "$(( sleep_ms / 1000 )).$(printf '%03d' $(( sleep_ms % 1000 )))"
+        delay_ms=$(( delay_ms * 2 > 5000 ? 5000 : delay_ms * 2 ))
+    done
+    echo "$name is ready!"
+}
+
+# Probe both services concurrently so startup waits for the slowest one only
+echo "Waiting for ZenML server and MLflow to be ready..."
+wait_for_service "ZenML server" "$ZENML_URL/health" &
+ZENML_WAIT_PID=$!
+wait_for_service "MLflow" "$MLFLOW_URL/health" &
+MLFLOW_WAIT_PID=$!
+wait "$ZENML_WAIT_PID" "$MLFLOW_WAIT_PID"
 
 # Check if server needs activation (first run)
 SERVER_INFO=$(curl -s "$ZENML_URL/api/v1/info")
@@ -107,42 +120,12 @@ echo ""
 echo "Connecting to ZenML server..."
 export ZENML_STORE_URL="$ZENML_URL"
 
-# Setup S3/MinIO artifact store if not already configured
-echo ""
-echo "Setting up S3 artifact store (MinIO)..."
-
-# Check if s3-artifacts store exists
-S3_STORE_EXISTS=$(zenml artifact-store list 2>/dev/null | grep -c "s3-artifacts" || true)
-
-if [ "$S3_STORE_EXISTS" = "0" ]; then
-    echo "Registering S3 artifact store..."
-    zenml artifact-store register s3-artifacts \
-        --flavor=s3 \
-        --path=s3://zenml-artifacts \
-        --client_kwargs='{"endpoint_url": "http://minio:9000"}' \
-        2>/dev/null || echo "Artifact store may already exist"
-fi
-
-# Check if s3-stack exists
-S3_STACK_EXISTS=$(zenml stack list 2>/dev/null | grep -c "s3-stack" || true)
-
-if [ "$S3_STACK_EXISTS" = "0" ]; then
-    echo "Registering S3 stack..."
-    zenml stack register s3-stack \
-        -a s3-artifacts \
-        -o default \
-        2>/dev/null || echo "Stack may already exist"
-fi
-
-# Set the S3 stack as active
-echo "Setting s3-stack as active..."
-zenml stack set s3-stack 2>/dev/null || true
-
-# Run the ZenML pipeline
+# Setup S3/MinIO artifact store and stack if not already configured, then run
+# the ZenML pipeline in the same Python process
 echo ""
 echo "Running ZenML pipeline..."
 cd /app
-python run_pipeline.py
+python run_pipeline.py --setup-stack
 
 echo ""
 echo "=============================================="
@@ -7,10 +7,14 @@ ADMIN_USER="${ZENML_DEFAULT_USER_NAME:-admin}"
 ADMIN_PASS="${ZENML_DEFAULT_USER_PASSWORD:-zenml}"
 SERVICE_ACCOUNT_NAME="pipeline-runner"
 
-# Wait for ZenML server
-until curl -s "$ZENML_URL/health" > /dev/null 2>&1; do
+# Wait for ZenML server to answer a HEAD probe with a non-5xx status,
+# backing off exponentially with jitter (0.25s up to 5s)
+DELAY_MS=250
+until STATUS=$(curl -s -o /dev/null -I -w '%{http_code}' "$ZENML_URL/health") && [ "$STATUS" -lt 500 ]; do
     echo "Waiting for ZenML server..."
-    sleep 2
+    SLEEP_MS=$(( DELAY_MS / 2 + RANDOM % (DELAY_MS / 2 + 1) ))
+    sleep "$(( SLEEP_MS / 1000 )).$(printf '%03d' $(( SLEEP_MS % 1000 )))"
+    DELAY_MS=$(( DELAY_MS * 2 > 5000 ? 5000 : DELAY_MS * 2 ))
 done
 
 # Authenticate as admin to get access token
@@ -0,0 +1,71 @@
+# zenml_stack.py
+from zenml.client import Client
+from zenml.enums import StackComponentType
+from zenml.exceptions import EntityExistsError
+
+# S3/MinIO stack configuration
+ARTIFACT_STORE_NAME = "s3-artifacts"
+ARTIFACT_STORE_PATH = "s3://zenml-artifacts"
+MINIO_ENDPOINT_URL = "http://minio:9000"
+STACK_NAME = "s3-stack"
+
+
+def setup_zenml_stack(client: Client) -> None:
+    """
+    Register the MinIO-backed artifact store and stack if missing, then activate the stack.
+
+    Uses the ZenML Python API directly so the whole setup runs in one interpreter
+    instead of spawning a `zenml` CLI process (and re-importing ZenML) per command.
+
+    Args:
+        client: Authenticated ZenML client
+    """
+    print("Setting up S3 artifact store (MinIO)...")
+
+    # A registered stack already references its artifact store, so on warm
+    # starts a single lookup is enough and the component check is skipped
+    stacks = client.list_stacks(name=STACK_NAME)
+    if stacks.total == 0:
+        artifact_stores = client.list_stack_components(
+            name=ARTIFACT_STORE_NAME,
+            type=StackComponentType.ARTIFACT_STORE,
+        )
+        if artifact_stores.total == 0:
+            print("Registering S3 artifact store...")
+            try:
+                client.create_stack_component(
+                    name=ARTIFACT_STORE_NAME,
+                    flavor="s3",
+                    component_type=StackComponentType.ARTIFACT_STORE,
+                    configuration={
+                        "path": ARTIFACT_STORE_PATH,
+                        "client_kwargs": {"endpoint_url": MINIO_ENDPOINT_URL},
+                    },
+                )
+            except EntityExistsError:
+                print("Artifact store may already exist")
+
+        print("Registering S3 stack...")
+        try:
+            client.create_stack(
+                name=STACK_NAME,
+                components={
+                    StackComponentType.ARTIFACT_STORE: ARTIFACT_STORE_NAME,
+                    StackComponentType.ORCHESTRATOR: "default",
+                },
+            )
+        except EntityExistsError:
+            print("Stack may already exist")
+
+    print(f"Setting {STACK_NAME} as active...")
+    client.activate_stack(STACK_NAME)
+
+
+def main():
+    """
+    Main function for running the stack setup directly.
+    """
+    setup_zenml_stack(Client())
+
+if __name__ == "__main__":
+    main()
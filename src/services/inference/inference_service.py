@@ -1,15 +1,30 @@
 # inference_service.py
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from typing import List
 import mlflow
 import mlflow.sklearn
 import numpy as np
 import pandas as pd
+import joblib
+import sklearn
+import re
 import os
+import socket
+import asyncio
 import subprocess
+import functools
+import threading
+import time
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from prometheus_client import Counter, make_asgi_app
 import logging
-from datetime import datetime
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,7 +36,8 @@ mlflow.set_tracking_uri(mlflow_uri)
 logger.info(f"Using MLflow tracking URI: {mlflow_uri}")
 
 # Initialize FastAPI app
-app = FastAPI(title="Iris Prediction API")
+# Responses are serialized with orjson rather than the stdlib json module
+app = FastAPI(title="Iris Prediction API", default_response_class=ORJSONResponse)
 
 # Define input data model
 class IrisFeatures(BaseModel):
@@ -30,6 +46,78 @@ class IrisFeatures(BaseModel):
     petal_length: float
     petal_width: float
 
+_iris_features_batch = TypeAdapter(List[IrisFeatures])
+
+def _body_validation_error(e: ValidationError) -> RequestValidationError:
+    """
+    Convert a pydantic ValidationError into FastAPI's 422 error, with locations under "body".
+    """
+    return RequestValidationError(
+        [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+    )
+
+async def parse_iris_features(request: Request) -> IrisFeatures:
+    """
+    Parse the request body straight from JSON bytes with pydantic-core.
+    
+    Skips FastAPI's generic body handling (stdlib json.loads into a dict, then
+    validation of that dict) on the hot /predict path.
+    
+    Raises:
+        RequestValidationError: If the body is not valid IrisFeatures JSON (422 response)
+    """
+    try:
+        return IrisFeatures.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise _body_validation_error(e)
+
+async def parse_iris_features_batch(request: Request) -> List[IrisFeatures]:
+    """
+    Parse a JSON array of IrisFeatures straight from the request body bytes.
+    
+    Raises:
+        HTTPException: 413 if the body or the number of rows exceeds the batch limits
+        RequestValidationError: If the body is not a valid IrisFeatures array (422 response)
+    """
+    # Refuse oversized bodies before reading them into memory: up front from the declared
+    # length, and while streaming for chunked or understated bodies
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"Request body too large. Send at most {MAX_BATCH_BODY_BYTES} bytes per request."
+    )
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > MAX_BATCH_BODY_BYTES:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > MAX_BATCH_BODY_BYTES:
+            raise too_large
+    try:
+        features = _iris_features_batch.validate_json(body)
+    except ValidationError as e:
+        raise _body_validation_error(e)
+    if len(features) > MAX_BATCH_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many rows. Send at most {MAX_BATCH_ROWS} rows per request."
+        )
+    return features
+
+# Request body schemas for endpoints that parse IrisFeatures themselves (keeps /docs accurate)
+IRIS_FEATURES_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": IrisFeatures.model_json_schema()}},
+    }
+}
+IRIS_FEATURES_BATCH_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": _iris_features_batch.json_schema()}},
+    }
+}
+
 # Prometheus counter for number of prediction requests
 prediction_count = Counter("prediction_requests_total", "Total prediction requests")
 retrain_count = Counter("model_retrain_total", "Total model retrain requests")
@@ -41,91 +129,532 @@ app.mount("/metrics", metrics_app)
 # Model Registry configuration
 MODEL_NAME = "iris-classifier"
 
+# Retraining mode: "subprocess" runs the pipeline-runner container through docker compose,
+# "docker" runs the same image directly through the Docker SDK (no compose CLI)
+RETRAIN_MODE = os.environ.get("RETRAIN_MODE", "subprocess")
+RETRAIN_TIMEOUT_SECONDS = 600
+# After this long a started retrain no longer blocks /retrain, even if its background task
+# never cleared it (e.g. the response failed, so the task never ran); leaves the task
+# time to reload the model after a pipeline that hit RETRAIN_TIMEOUT_SECONDS
+RETRAIN_STALE_SECONDS = RETRAIN_TIMEOUT_SECONDS + 60
+RETRAIN_LOG_TAIL_LINES = 200
+# Minimum time after a successful retrain before /retrain accepts another one, so a burst of
+# triggers arriving around a retrain coalesces into it (a failed retrain can be retried at once)
+RETRAIN_DEBOUNCE_SECONDS = float(os.environ.get("RETRAIN_DEBOUNCE_SECONDS", "30"))
+
+# Container settings for RETRAIN_MODE=docker. The image must already be built
+# (docker compose --profile pipeline build pipeline-runner); the listed variables are
+# forwarded from this service's own environment, which docker-compose.yml shares with
+# the pipeline-runner service, and the data-file volume is mounted from this container
+PIPELINE_RUNNER_IMAGE = os.environ.get("PIPELINE_RUNNER_IMAGE", "zenml_mlops_template-pipeline-runner")
+PIPELINE_RUNNER_NETWORK = os.environ.get("PIPELINE_RUNNER_NETWORK", "zenml_mlops_template_default")
+PIPELINE_RUNNER_ENV_VARS = [
+    "MLFLOW_TRACKING_URI",
+    "ZENML_STORE_URL",
+    "ZENML_STORE_API_KEY",
+    "AWS_ACCESS_KEY_ID",
+    "AWS_SECRET_ACCESS_KEY",
+    "AWS_DEFAULT_REGION",
+    "ZENML_DEFAULT_USER_NAME",
+    "ZENML_DEFAULT_USER_PASSWORD",
+]
+PIPELINE_RUNNER_DATA_DIR = "/app/data-file"
+
+# Feature names in training order (models from older runs were fitted on a DataFrame with these columns)
+FEATURE_NAMES = [
+    "sepal length (cm)",
+    "sepal width (cm)",
+    "petal length (cm)",
+    "petal width (cm)",
+]
+
+# Micro-batching: concurrent /predict requests are grouped into a single model.predict call
+MAX_BATCH = 64
+MAX_WAIT_MS = 5
+
+# /predict/batch limits, so one request cannot occupy a prediction worker for long
+# (the byte limit allows generous whitespace per row and is checked before parsing)
+MAX_BATCH_ROWS = int(os.environ.get("MAX_BATCH_ROWS", "10000"))
+MAX_BATCH_BODY_BYTES = MAX_BATCH_ROWS * 512
+
+# Requests waiting for the batcher; beyond this /predict answers 503 instead of queueing
+MAX_PENDING_PREDICTIONS = int(os.environ.get("MAX_PENDING_PREDICTIONS", "1024"))
+
+# /predict/batch requests waiting for a prediction worker; beyond this it answers 503
+MAX_PENDING_BATCH_REQUESTS = int(os.environ.get("MAX_PENDING_BATCH_REQUESTS", "32"))
+
+# Threads running model.predict; bounded so bursts queue up instead of occupying
+# the shared Starlette threadpool that also serves /health and /model/info
+PREDICT_WORKERS = int(os.environ.get("PREDICT_WORKERS", os.cpu_count() or 2))
+
+# n_jobs for each loaded model's predict (-1 = all cores); unset keeps the trained value.
+# Only worth it for large /predict/batch calls: on small batches the per-call thread
+# dispatch costs more than it saves, and PREDICT_WORKERS already uses the other cores
+SKLEARN_N_JOBS = int(os.environ["SKLEARN_N_JOBS"]) if os.environ.get("SKLEARN_N_JOBS") else None
+
+# Worker processes for model.predict (0 = predict in PREDICT_WORKERS threads). Only pays
+# off for models large enough that predict, not the process round-trip, dominates;
+# a good size is the CPU count minus one, leaving a core for the event loop
+PREDICT_PROCESSES = int(os.environ.get("PREDICT_PROCESSES", "0"))
+
+# Background model loading retries when no model was available at startup
+MODEL_RETRY_INITIAL_SECONDS = 5
+MODEL_RETRY_MAX_SECONDS = 60
+
+# How long registry metadata (/model/info) and failed /health load attempts are reused
+REGISTRY_CACHE_TTL_SECONDS = 30
+
+# Local copies of downloaded models, so restarts skip the artifact store (empty disables)
+MODEL_CACHE_DIR = os.environ.get("MODEL_CACHE_DIR", "/app/.model_cache")
+# Most recently used models kept there (matches the in-memory cache of _load_sklearn_model)
+MODEL_CACHE_MAX_FILES = 4
+
 # Global variable for model
 model = None
 current_model_version = None
+current_model_uri = None
+
+# Serializes model (re)loads between startup, requests and background retraining
+_model_lock = threading.Lock()
+
+# Monotonic start time of the running retrain (None when idle), so /retrain never starts
+# a second concurrent pipeline; _retrain_state_lock guards it and _last_retrain_success
+_retrain_started_at = None
+_retrain_state_lock = threading.Lock()
+
+# Monotonic time at which the last successful retrain finished
+_last_retrain_success = float("-inf")
+
+# Pending (features, future) pairs for the batcher, the slots limiting concurrent predict
+# calls, the prediction thread (or process) pool, and the background tasks (created at startup)
+_predict_queue = None
+_predict_slots = None
+_predict_executor = None
+_predict_process_pool = None
+_batcher_task = None
+_model_loader_task = None
+
+# /predict/batch requests waiting for a prediction slot
+_pending_batch_requests = 0
+
+# Monotonic time of the last model load attempt made by /health
+_last_health_load_attempt = float("-inf")
+
+@functools.lru_cache(maxsize=1)
+def _client():
+    """
+    Get the shared MLflow client so registry calls reuse one instance across requests.
+    """
+    return mlflow.tracking.MlflowClient()
+
+def _prepare_model(loaded):
+    """
+    Adjust a freshly loaded estimator for serving.
+    
+    Models fitted on a DataFrame remember its column names and make sklearn check
+    them (or warn) on every predict. When those names are exactly FEATURE_NAMES,
+    in order, plain arrays built in that order are equivalent, so the names are
+    dropped and predictions skip the DataFrame entirely. SKLEARN_N_JOBS, if set,
+    overrides the n_jobs the model was trained with.
+    
+    The estimator is also warmed up here, before it replaces the serving model, so
+    no request (after startup, a background load or a retrain) pays first-call costs.
+    """
+    names = getattr(loaded, "feature_names_in_", None)
+    if names is not None and list(names) == FEATURE_NAMES:
+        del loaded.feature_names_in_
+    if SKLEARN_N_JOBS is not None and hasattr(loaded, "n_jobs"):
+        loaded.n_jobs = SKLEARN_N_JOBS
+    _warm_up_model(loaded)
+    return loaded
+
+def _model_cache_path(model_uri: str) -> str:
+    """
+    Get the local cache file for a model URI (and the installed sklearn version).
+    """
+    key = re.sub(r"[^A-Za-z0-9.-]+", "_", model_uri)
+    return os.path.join(MODEL_CACHE_DIR, f"{key}-sklearn{sklearn.__version__}.joblib")
+
+def _prune_model_cache():
+    """
+    Delete all but the MODEL_CACHE_MAX_FILES most recently used model cache files.
+    
+    Old production models, files written by other sklearn versions and files with an
+    outdated key are never read again, so without this the cache volume only grows.
+    """
+    files = []
+    for entry in os.scandir(MODEL_CACHE_DIR):
+        if entry.name.endswith(".joblib"):
+            try:
+                files.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                pass  # Pruned by another process meanwhile
+    files.sort(reverse=True)
+    for _, path in files[MODEL_CACHE_MAX_FILES:]:
+        try:
+            os.remove(path)
+            logger.info(f"Removed old model cache file {path}")
+        except FileNotFoundError:
+            pass
+
+def _fetch_sklearn_model(model_uri: str):
+    """
+    Load a model from the local disk cache, or download it from MLflow and cache it.
+    
+    Cache problems are logged and never fail the load; MLflow stays the source of truth.
+    """
+    if not MODEL_CACHE_DIR:
+        return mlflow.sklearn.load_model(model_uri)
+    
+    path = _model_cache_path(model_uri)
+    if os.path.exists(path):
+        try:
+            loaded = joblib.load(path)
+            logger.info(f"Loaded {model_uri} from local cache")
+            # Mark the file as recently used, so pruning keeps it
+            os.utime(path)
+            return loaded
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable model cache file {path}: {str(e)}")
+    
+    loaded = mlflow.sklearn.load_model(model_uri)
+    try:
+        # Write to a temp file first so readers never see a partial file
+        os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(loaded, tmp_path)
+        os.replace(tmp_path, path)
+        _prune_model_cache()
+    except Exception as e:
+        logger.warning(f"Could not cache model locally: {str(e)}")
+    return loaded
+
+@functools.lru_cache(maxsize=4)
+def _load_sklearn_model(model_uri: str):
+    """
+    Download, deserialize and prepare a model, keeping recent ones in memory.
+    
+    Only immutable URIs are passed in (a run's artifact location, never a registry
+    name/version, whose numbering restarts if the model is re-registered), so a
+    reload of the same model skips the artifact download and unpickling, and a
+    restart skips the download (see _fetch_sklearn_model).
+    """
+    return _prepare_model(_fetch_sklearn_model(model_uri))
 
 def load_model_from_mlflow():
     """
     Load the production model from MLflow Model Registry.
     Falls back to latest run if no production model is registered.
     """
-    global model, current_model_version
-    client = mlflow.tracking.MlflowClient()
+    global model, current_model_version, current_model_uri
     
-    try:
-        # Try to load from Model Registry (production alias)
-        model_version = client.get_model_version_by_alias(MODEL_NAME, "production")
-        model_uri = f"models:/{MODEL_NAME}@production"
-        model = mlflow.sklearn.load_model(model_uri)
-        current_model_version = model_version.version
-        logger.info(f"Loaded production model from registry: {MODEL_NAME} v{model_version.version}")
-        return True
-    except mlflow.exceptions.MlflowException as e:
-        logger.warning(f"No production model in registry, trying latest run: {e}")
+    with _model_lock:
+        client = _client()
     
-    # Fallback: Load from latest experiment run (for backward compatibility)
-    try:
-        experiment_name = "iris_classification"
-        mlflow.set_experiment(experiment_name)
-        experiment = client.get_experiment_by_name(experiment_name)
+        try:
+            # Try to load from Model Registry (production alias)
+            model_version = client.get_model_version_by_alias(MODEL_NAME, "production")
+            # Load the version's artifacts directly: unlike models:/name/version, the
+            # source location identifies the model itself, so it is safe as a cache key
+            model_uri = model_version.source
+            model = _load_sklearn_model(model_uri)
+            current_model_version = model_version.version
+            current_model_uri = model_uri
+            logger.info(f"Loaded production model from registry: {MODEL_NAME} v{model_version.version}")
+            return True
+        except mlflow.exceptions.MlflowException as e:
+            logger.warning(f"No production model in registry, trying latest run: {e}")
+    
+        # Fallback: Load from latest experiment run (for backward compatibility)
+        try:
+            experiment_name = "iris_classification"
+            # set_experiment already returns the experiment, no need to look it up again
+            experiment = mlflow.set_experiment(experiment_name)
         
-        if experiment:
+            # Only finished runs are guaranteed to have a logged model artifact
             runs = client.search_runs(
                 experiment_ids=[experiment.experiment_id],
+                filter_string="attributes.status = 'FINISHED'",
                 order_by=["attributes.start_time DESC"],
                 max_results=1
             )
-            
+        
             if runs:
                 run_id = runs[0].info.run_id
-                model = mlflow.sklearn.load_model(f"runs:/{run_id}/model")
+                model_uri = f"runs:/{run_id}/model"
+                model = _load_sklearn_model(model_uri)
                 current_model_version = f"run:{run_id[:8]}"
+                current_model_uri = model_uri
                 logger.info(f"Loaded model from MLflow run: {run_id}")
                 return True
         
-        logger.warning("No model found in MLflow")
-        return False
+            logger.warning("No model found in MLflow")
+            return False
+        except Exception as e:
+            logger.error(f"Error loading model from MLflow: {str(e)}")
+            return False
+
+def _try_load_model():
+    """
+    Call load_model_from_mlflow, logging (rather than raising) unexpected load errors.
+    
+    load_model_from_mlflow only handles registry and MLflow errors itself; errors
+    while loading the artifact (I/O, unpickling) would otherwise fail startup or
+    /health, or end the background retry loop.
+    
+    Returns:
+        bool: True if a model was loaded
+    """
+    try:
+        return load_model_from_mlflow()
     except Exception as e:
-        logger.error(f"Error loading model from MLflow: {str(e)}")
+        logger.error(f"Error loading model: {str(e)}")
         return False
 
-@app.post("/predict")
-def predict(features: IrisFeatures):
+def _predict_rows(rows: np.ndarray, estimator=None) -> np.ndarray:
+    """
+    Run the model on a block of feature rows.
+    
+    Args:
+        rows: (n, 4) feature matrix in FEATURE_NAMES order
+        estimator: Model to use instead of the serving model
+        
+    Returns:
+        np.ndarray: Predicted class per row
+    """
+    if estimator is None:
+        estimator = model
+    # Rows go to the model as a plain array; only a model fitted on differently
+    # named or ordered columns (see _prepare_model) needs a DataFrame wrapper
+    if hasattr(estimator, "feature_names_in_"):
+        rows = pd.DataFrame(rows, columns=FEATURE_NAMES, copy=False)
+    return estimator.predict(rows)
+
+def _init_predict_worker(model_uri):
+    """
+    Load the serving model into a new prediction worker process, if one is known yet.
+    
+    Best effort: an exception here would break the whole pool, while a model that
+    fails to preload is simply loaded again on the worker's first prediction.
+    """
+    if model_uri is None:
+        return
+    try:
+        _load_sklearn_model(model_uri)
+    except Exception as e:
+        logger.warning(f"Prediction worker could not preload {model_uri}: {str(e)}")
+
+def _create_predict_process_pool():
+    """
+    Start the prediction worker processes, preloading the current serving model.
+    
+    Workers are spawned rather than forked from the threaded server.
+    """
+    return ProcessPoolExecutor(
+        max_workers=PREDICT_PROCESSES,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_predict_worker,
+        initargs=(current_model_uri,),
+    )
+
+def _predict_in_worker(model_uri: str, rows: np.ndarray) -> np.ndarray:
+    """
+    Run _predict_rows in a prediction worker process.
+    
+    Each worker keeps recently used models in memory (see _load_sklearn_model), so
+    after a reload only the first prediction per worker loads the new model, from
+    the local disk cache rather than MLflow.
+    """
+    return _predict_rows(rows, _load_sklearn_model(model_uri))
+
+def _check_finite(rows: np.ndarray) -> None:
+    """
+    Reject feature rows that are not finite once stored as float32.
+    
+    Values such as 1e39 pass validation as floats but overflow to inf in float32,
+    and sklearn refuses to predict on inf/NaN. Checking each request before it is
+    batched keeps one bad request from failing everyone batched with it.
+    
+    Raises:
+        HTTPException: 422 if any value is NaN or infinite in float32
+    """
+    if not np.isfinite(rows).all():
+        raise HTTPException(
+            status_code=422,
+            detail="Feature values must be finite and within float32 range."
+        )
+
+async def _run_predict(rows: np.ndarray) -> np.ndarray:
+    """
+    Run _predict_rows on the bounded prediction thread pool, or on the prediction
+    worker processes when PREDICT_PROCESSES is set.
+    """
+    global _predict_process_pool
+    loop = asyncio.get_running_loop()
+    model_uri = current_model_uri
+    pool = _predict_process_pool
+    if pool is None or model_uri is None:
+        return await loop.run_in_executor(_predict_executor, _predict_rows, rows)
+    
+    try:
+        return await loop.run_in_executor(pool, _predict_in_worker, model_uri, rows)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); replace the pool once, for all
+        # batches that saw it break, and retry this batch on the new one
+        if _predict_process_pool is pool:
+            logger.error("Prediction worker pool broke, starting a new one")
+            pool.shutdown(wait=False, cancel_futures=True)
+            _predict_process_pool = _create_predict_process_pool()
+        return await loop.run_in_executor(_predict_process_pool, _predict_in_worker, model_uri, rows)
+
+async def _resolve_batch(batch, rows: np.ndarray):
+    """
+    Predict one batch and resolve the futures of its requests.
+    """
+    try:
+        preds = await _run_predict(rows)
+    except Exception as e:
+        logger.error(f"Batch prediction failed: {str(e)}")
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(e)
+        return
+    
+    for (_, future), pred in zip(batch, preds):
+        if not future.done():
+            future.set_result(int(pred))
+
+async def _batch_worker():
+    """
+    Collect queued prediction requests into batches and dispatch them to the prediction pool.
+    
+    A batch is flushed when it reaches MAX_BATCH requests or MAX_WAIT_MS after its
+    first request arrived. Up to one batch per pool worker runs at a time (the workers are
+    shared with /predict/batch); while all are busy, new requests wait in the queue and
+    form a larger next batch.
+    """
+    loop = asyncio.get_running_loop()
+    running = set()
+    
+    try:
+        while True:
+            # Wait for work before taking a slot, so an idle batcher doesn't hold one
+            first = await _predict_queue.get()
+            await _predict_slots.acquire()
+            batch = [first]
+            deadline = loop.time() + MAX_WAIT_MS / 1000
+            while len(batch) < MAX_BATCH:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(_predict_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Each batch gets its own array, since several can be in flight at once
+            rows = np.stack([row for row, _ in batch])
+            
+            # Count the whole batch at once rather than taking the counter lock per request
+            prediction_count.inc(len(batch))
+            
+            task = asyncio.create_task(_resolve_batch(batch, rows))
+            running.add(task)
+            task.add_done_callback(running.discard)
+            task.add_done_callback(lambda _: _predict_slots.release())
+    finally:
+        for task in running:
+            task.cancel()
+
+@app.post("/predict", openapi_extra=IRIS_FEATURES_OPENAPI)
+async def predict(features: IrisFeatures = Depends(parse_iris_features)):
     """
     Make a prediction with the trained model.
     
+    The request is queued and answered by the micro-batcher together with any
+    other requests that arrive within MAX_WAIT_MS.
+    
     Args:
         features: Input features for prediction
         
     Returns:
         dict: Prediction result
     """
-    global model
+    # Fail fast: loading happens at startup and in the background, never on a request
+    if model is None:
+        raise HTTPException(
+            status_code=503, 
+            detail="Model not available. Please train the model first."
+        )
+    
+    # Build the row in training column order, as the batcher will store it
+    with np.errstate(over="ignore"):
+        row = np.array(
+            (features.sepal_length, features.sepal_width, features.petal_length, features.petal_width),
+            dtype=np.float32,
+        )
+    _check_finite(row)
+    
+    # Queue the features and wait for the batch result; shed load rather than queue without bound
+    future = asyncio.get_running_loop().create_future()
+    try:
+        _predict_queue.put_nowait((row, future))
+    except asyncio.QueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many pending predictions. Please retry shortly.",
+            headers={"Retry-After": "1"},
+        )
+    pred_class = await future
+    return {"prediction": pred_class}
+
+@app.post("/predict/batch", openapi_extra=IRIS_FEATURES_BATCH_OPENAPI)
+async def predict_batch(features: List[IrisFeatures] = Depends(parse_iris_features_batch)):
+    """
+    Make predictions for many feature rows with a single model call.
     
-    # Try to load the model if it's not already loaded
+    Args:
+        features: List of input features for prediction
+        
+    Returns:
+        dict: Predictions, in the same order as the input rows
+    """
     if model is None:
-        success = load_model_from_mlflow()
-        if not success:
-            raise HTTPException(
-                status_code=503, 
-                detail="Model not available. Please train the model first."
-            )
+        raise HTTPException(
+            status_code=503, 
+            detail="Model not available. Please train the model first."
+        )
     
-    # Increment the prediction counter
-    prediction_count.inc()
+    if not features:
+        return {"predictions": []}
     
-    # Prepare the data for prediction with feature names matching training data
-    data = pd.DataFrame([{
-        "sepal length (cm)": features.sepal_length,
-        "sepal width (cm)": features.sepal_width,
-        "petal length (cm)": features.petal_length,
-        "petal width (cm)": features.petal_width
-    }])
+    with np.errstate(over="ignore"):
+        rows = np.array(
+            [(f.sepal_length, f.sepal_width, f.petal_length, f.petal_width) for f in features],
+            dtype=np.float32,
+        )
+    _check_finite(rows)
     
-    # Make the prediction
-    pred_class = int(model.predict(data)[0])
-    return {"prediction": pred_class}
+    # Share the prediction workers with the batcher; shed load rather than queue without bound
+    global _pending_batch_requests
+    if _pending_batch_requests >= MAX_PENDING_BATCH_REQUESTS:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many pending batch predictions. Please retry shortly.",
+        )
+    _pending_batch_requests += 1
+    try:
+        await _predict_slots.acquire()
+    finally:
+        _pending_batch_requests -= 1
+    
+    try:
+        # Increment the prediction counter once per row
+        prediction_count.inc(len(features))
+        preds = await _run_predict(rows)
+    finally:
+        _predict_slots.release()
+    return {"predictions": [int(pred) for pred in preds]}
 
 @app.get("/health")
 def health():
@@ -135,10 +664,16 @@ def health():
     Returns:
         dict: Status message including model version
     """
-    # Check if model is loaded or can be loaded
-    global model, current_model_version
+    # Check if model is loaded or can be loaded; while none is available, only retry the
+    # (registry round-trip) load once per REGISTRY_CACHE_TTL_SECONDS so frequent probes stay cheap
+    global _last_health_load_attempt
     if model is None:
-        model_available = load_model_from_mlflow()
+        now = time.monotonic()
+        if now - _last_health_load_attempt >= REGISTRY_CACHE_TTL_SECONDS:
+            _last_health_load_attempt = now
+            model_available = _try_load_model()
+        else:
+            model_available = False
     else:
         model_available = True
     
@@ -150,26 +685,30 @@ def health():
         "model_name": MODEL_NAME
     }
 
-@app.get("/model/info")
-def model_info():
+@functools.lru_cache(maxsize=2)
+def _get_model_info_cached(model_name: str, ttl_bucket: int) -> dict:
     """
-    Get detailed information about the current production model.
+    Build the /model/info payload from the registry (cached per model and TTL window).
+    
+    Args:
+        model_name: Registered model name
+        ttl_bucket: Current TTL window index, so entries expire after REGISTRY_CACHE_TTL_SECONDS
     
     Returns:
         dict: Model metadata from MLflow Model Registry
     """
-    client = mlflow.tracking.MlflowClient()
+    client = _client()
     
     try:
         # Get production model version from registry
-        model_version = client.get_model_version_by_alias(MODEL_NAME, "production")
+        model_version = client.get_model_version_by_alias(model_name, "production")
         run = client.get_run(model_version.run_id)
         
         # Get all versions for this model
-        all_versions = client.search_model_versions(f"name='{MODEL_NAME}'")
+        all_versions = client.search_model_versions(f"name='{model_name}'")
         
         return {
-            "model_name": MODEL_NAME,
+            "model_name": model_name,
             "production_version": model_version.version,
             "run_id": model_version.run_id,
             "created_at": model_version.creation_timestamp,
@@ -192,12 +731,26 @@ def model_info():
         }
     except mlflow.exceptions.MlflowException as e:
         return {
-            "model_name": MODEL_NAME,
+            "model_name": model_name,
             "production_version": None,
             "error": f"No production model registered: {str(e)}",
             "total_versions": 0
         }
 
+@app.get("/model/info")
+def model_info():
+    """
+    Get detailed information about the current production model.
+    
+    Registry metadata is reused for up to REGISTRY_CACHE_TTL_SECONDS (and refreshed
+    right after a retrain), so frequent polling doesn't hit MLflow each time.
+    
+    Returns:
+        dict: Model metadata from MLflow Model Registry
+    """
+    ttl_bucket = int(time.time() // REGISTRY_CACHE_TTL_SECONDS)
+    return _get_model_info_cached(MODEL_NAME, ttl_bucket)
+
 @app.post("/retrain")
 def retrain_model(background_tasks: BackgroundTasks):
     """
@@ -205,62 +758,302 @@ def retrain_model(background_tasks: BackgroundTasks):
     
     Returns:
         dict: Status message
+        
+    Raises:
+        HTTPException: 409 if a retrain is already running, 429 if the last one
+            succeeded less than RETRAIN_DEBOUNCE_SECONDS ago
     """
+    global _retrain_started_at
+    with _retrain_state_lock:
+        now = time.monotonic()
+        # Only one retrain at a time; the background task clears the start time when done
+        if _retrain_started_at is not None and now - _retrain_started_at < RETRAIN_STALE_SECONDS:
+            raise HTTPException(
+                status_code=409,
+                detail="Model retraining is already in progress."
+            )
+        
+        # Coalesce bursts: the retrain that just succeeded already covers triggers right after it
+        wait_seconds = _last_retrain_success + RETRAIN_DEBOUNCE_SECONDS - now
+        if wait_seconds > 0:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Model was retrained recently. Try again in {wait_seconds:.0f} seconds.",
+                headers={"Retry-After": str(int(wait_seconds) + 1)},
+            )
+        _retrain_started_at = now
+
     # Increment the retrain counter
     retrain_count.inc()
     
     # Add the retraining task to background tasks
-    background_tasks.add_task(_retrain_model_task)
+    background_tasks.add_task(_retrain_model_task, now)
     
     return {
         "status": "retraining_started",
         "message": "Model retraining has been started in the background. The new model will be used for predictions once training is complete."
     }
 
-def _retrain_model_task():
+def _follow_pipeline_output(lines, kill):
     """
-    Background task to retrain the model by triggering the pipeline-runner container.
+    Log pipeline output as it arrives, stopping the pipeline if it runs past the timeout.
+    
+    Args:
+        lines: Output lines; iteration ends when the pipeline exits (or is killed)
+        kill: Callable that stops the pipeline
+    
+    Returns:
+        tuple: The last RETRAIN_LOG_TAIL_LINES lines, and whether the timeout was hit
     """
+    timed_out = threading.Event()
+    def _kill():
+        timed_out.set()
+        kill()
+    timer = threading.Timer(RETRAIN_TIMEOUT_SECONDS, _kill)
+    timer.daemon = True
+    timer.start()
+    
+    # Keep only the last lines for the failure report
+    tail = deque(maxlen=RETRAIN_LOG_TAIL_LINES)
     try:
-        logger.info("Starting model retraining via pipeline-runner...")
-        
-        # Trigger the pipeline-runner container via docker compose
-        # Use -p to specify project name matching the existing containers
-        # Use --no-deps to avoid recreating dependent services
-        result = subprocess.run(
-            [
-                "docker", "compose",
-                "-p", "zenml_mlops_template",
-                "--profile", "pipeline",
-                "run", "--rm", "--no-deps", "pipeline-runner"
-            ],
-            capture_output=True,
-            text=True,
-            cwd="/app/workspace",  # Mount point for the project
-            timeout=600  # 10 minute timeout
-        )
-        
-        if result.returncode == 0:
-            logger.info("Pipeline completed successfully")
-            logger.info(f"Output: {result.stdout[-500:] if len(result.stdout) > 500 else result.stdout}")
+        for line in lines:
+            line = line.rstrip()
+            tail.append(line)
+            logger.info(f"[pipeline-runner] {line}")
+    finally:
+        timer.cancel()
+    return tail, timed_out.is_set()
+
+def _log_pipeline_result(returncode, tail):
+    """
+    Log the outcome of a pipeline-runner execution.
+    
+    Returns:
+        bool: True if the pipeline succeeded
+    """
+    if returncode == 0:
+        logger.info("Pipeline completed successfully")
+        return True
+    logger.error(f"Pipeline failed with code {returncode}")
+    logger.error("Last output:\n" + "\n".join(tail))
+    return False
+
+def _iter_lines(chunks):
+    """
+    Split a stream of byte chunks (which may hold several or partial lines) into text lines.
+    """
+    pending = ""
+    for chunk in chunks:
+        pending += chunk.decode(errors="replace")
+        *lines, pending = pending.split("\n")
+        yield from lines
+    if pending:
+        yield pending
+
+@functools.lru_cache(maxsize=1)
+def _docker_client():
+    """
+    Get the shared Docker SDK client (the docker package is only needed for RETRAIN_MODE=docker).
+    """
+    import docker
+    return docker.from_env()
+
+def _pipeline_runner_volumes(client):
+    """
+    Find the host source of this container's data-file mount, to share it with the pipeline-runner.
+    
+    Returns:
+        dict: Volumes argument for containers.run (empty if the mount cannot be found)
+    """
+    try:
+        mounts = client.containers.get(socket.gethostname()).attrs["Mounts"]
+    except Exception as e:
+        logger.warning(f"Could not inspect own container for the {PIPELINE_RUNNER_DATA_DIR} mount: {e}")
+        return {}
+    for mount in mounts:
+        if mount.get("Destination") == PIPELINE_RUNNER_DATA_DIR:
+            source = mount["Name"] if mount.get("Type") == "volume" else mount["Source"]
+            return {source: {"bind": PIPELINE_RUNNER_DATA_DIR, "mode": "rw"}}
+    logger.warning(f"No {PIPELINE_RUNNER_DATA_DIR} mount found; pipeline-runner runs without it")
+    return {}
+
+def _retrain_subprocess():
+    """
+    Retrain the model by triggering the pipeline-runner container via docker compose.
+    
+    Returns:
+        bool: True if the pipeline succeeded
+    """
+    logger.info("Starting model retraining via pipeline-runner...")
+    
+    # Trigger the pipeline-runner container via docker compose
+    # Use -p to specify project name matching the existing containers
+    # Use --no-deps to avoid recreating dependent services
+    cmd = [
+        "docker", "compose",
+        "-p", "zenml_mlops_template",
+        "--profile", "pipeline",
+        "run", "--rm", "--no-deps", "pipeline-runner"
+    ]
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+        bufsize=1,
+        cwd="/app/workspace",  # Mount point for the project
+    )
+    
+    # Stream output as it arrives; killing the process ends the output
+    try:
+        tail, timed_out = _follow_pipeline_output(process.stdout, process.kill)
+        returncode = process.wait()
+    finally:
+        # If streaming failed, don't leave the pipeline running once the retrain lock is released
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+    
+    if timed_out:
+        raise subprocess.TimeoutExpired(cmd, RETRAIN_TIMEOUT_SECONDS)
+    return _log_pipeline_result(returncode, tail)
+
+def _retrain_docker():
+    """
+    Retrain the model by running the pipeline-runner image through the Docker SDK.
+    
+    Talks to the Docker daemon directly over its socket, skipping the docker compose
+    CLI startup and compose file parsing that _retrain_subprocess pays on every retrain.
+    
+    Returns:
+        bool: True if the pipeline succeeded
+    """
+    import docker
+    
+    logger.info("Starting model retraining via Docker SDK...")
+    client = _docker_client()
+    # Don't let containers.run fall back to pulling a locally built image from a registry
+    try:
+        client.images.get(PIPELINE_RUNNER_IMAGE)
+    except docker.errors.ImageNotFound:
+        raise RuntimeError(
+            f"Image {PIPELINE_RUNNER_IMAGE} not found; build it first with "
+            "docker compose --profile pipeline build pipeline-runner"
+        ) from None
+    
+    environment = {name: os.environ[name] for name in PIPELINE_RUNNER_ENV_VARS if name in os.environ}
+    container = client.containers.run(
+        PIPELINE_RUNNER_IMAGE,
+        detach=True,
+        network=PIPELINE_RUNNER_NETWORK,
+        environment=environment,
+        volumes=_pipeline_runner_volumes(client),
+    )
+    
+    # Stream logs until the container exits; killing it ends the stream
+    try:
+        logs = _iter_lines(container.logs(stream=True, follow=True))
+        tail, timed_out = _follow_pipeline_output(logs, container.kill)
+        returncode = container.wait()["StatusCode"]
+    finally:
+        container.remove(force=True)
+    
+    if timed_out:
+        raise TimeoutError(f"{PIPELINE_RUNNER_IMAGE} timed out after {RETRAIN_TIMEOUT_SECONDS}s")
+    return _log_pipeline_result(returncode, tail)
+
+def _retrain_model_task(started_at):
+    """
+    Background task to retrain the model, then reload the production model.
+    
+    Uses the pipeline-runner container via docker compose by default, or the same
+    image via the Docker SDK when RETRAIN_MODE=docker. Clears the retrain start time
+    set by /retrain when finished.
+    
+    Args:
+        started_at: Start time /retrain recorded for this retrain
+    """
+    global _last_retrain_success, _retrain_started_at
+    succeeded = False
+    try:
+        if RETRAIN_MODE == "docker":
+            succeeded = _retrain_docker()
         else:
-            logger.error(f"Pipeline failed with code {result.returncode}")
-            logger.error(f"Error: {result.stderr[-500:] if len(result.stderr) > 500 else result.stderr}")
+            succeeded = _retrain_subprocess()
         
-        # Reload the model after training
+        # Reload the model after training; registry metadata may have changed too
         load_model_from_mlflow()
+        _get_model_info_cached.cache_clear()
         logger.info("Model reloaded after retraining")
         
-    except subprocess.TimeoutExpired:
-        logger.error("Pipeline timed out after 10 minutes")
+    except (subprocess.TimeoutExpired, TimeoutError):
+        logger.error(f"Pipeline timed out after {RETRAIN_TIMEOUT_SECONDS} seconds")
     except Exception as e:
         logger.error(f"Error during model retraining: {str(e)}")
+    finally:
+        with _retrain_state_lock:
+            if succeeded:
+                _last_retrain_success = time.monotonic()
+            # Unless this retrain went stale and /retrain already started another one
+            if _retrain_started_at == started_at:
+                _retrain_started_at = None
+
+def _warm_up_model(estimator):
+    """
+    Run one dummy prediction so the first real request doesn't pay first-call costs.
+    """
+    try:
+        _predict_rows(np.zeros((1, len(FEATURE_NAMES)), dtype=np.float32), estimator)
+        logger.info("Model warmed up")
+    except Exception as e:
+        logger.warning(f"Model warm-up failed: {str(e)}")
+
+async def _retry_model_load():
+    """
+    Keep trying to load the model in the background, with exponential backoff, until one is available.
+    """
+    delay = MODEL_RETRY_INITIAL_SECONDS
+    while model is None:
+        await asyncio.sleep(delay)
+        await run_in_threadpool(_try_load_model)
+        delay = min(delay * 2, MODEL_RETRY_MAX_SECONDS)
 
 # Try to load the model at startup, but don't fail if it's not available
 @app.on_event("startup")
 def startup_event():
     """
-    Load the model when the application starts.
+    Load (and so warm up) the model when the application starts.
     """
     logger.info("Starting inference service...")
-    load_model_from_mlflow()
+    _try_load_model()
+
+@app.on_event("startup")
+async def start_background_tasks():
+    """
+    Start the prediction pools and micro-batching task, and the background model
+    loader if startup found no model.
+    """
+    global _predict_queue, _predict_slots, _predict_executor, _predict_process_pool, _batcher_task, _model_loader_task
+    # One slot per pool worker, shared by the batcher and /predict/batch
+    _predict_slots = asyncio.Semaphore(PREDICT_PROCESSES or PREDICT_WORKERS)
+    _predict_executor = ThreadPoolExecutor(max_workers=PREDICT_WORKERS, thread_name_prefix="predict")
+    if PREDICT_PROCESSES > 0:
+        _predict_process_pool = _create_predict_process_pool()
+    _predict_queue = asyncio.Queue(maxsize=MAX_PENDING_PREDICTIONS)
+    _batcher_task = asyncio.create_task(_batch_worker())
+    if model is None:
+        _model_loader_task = asyncio.create_task(_retry_model_load())
+
+@app.on_event("shutdown")
+def shutdown_event():
+    """
+    Stop the background tasks and the prediction pools.
+    """
+    for task in (_batcher_task, _model_loader_task):
+        if task is not None:
+            task.cancel()
+    for executor in (_predict_executor, _predict_process_pool):
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
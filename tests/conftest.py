@@ -0,0 +1,9 @@
+# conftest.py
+import os
+import sys
+
+# Keep the inference service off the network and the disk cache during tests
+os.environ.setdefault("MLFLOW_TRACKING_URI", "file:/tmp/zenml_mlops_template_test_mlruns")
+os.environ["MODEL_CACHE_DIR"] = ""
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "services", "inference"))
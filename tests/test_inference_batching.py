@@ -0,0 +1,254 @@
+# test_inference_batching.py
+import asyncio
+import contextlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import inference_service as svc
+
+
+class EchoModel:
+    """
+    Predicts the integer part of the first feature and, like sklearn, refuses inf/NaN input.
+    """
+    def __init__(self, fail_calls=0):
+        self.fail_calls = fail_calls
+        self.batch_sizes = []
+
+    def predict(self, X):
+        X = np.asarray(X)
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains infinity or a value too large for dtype('float32').")
+        if self.fail_calls:
+            self.fail_calls -= 1
+            raise RuntimeError("model failure")
+        self.batch_sizes.append(len(X))
+        return X[:, 0].astype(int)
+
+
+def features(first):
+    return svc.IrisFeatures(sepal_length=first, sepal_width=1.0, petal_length=1.0, petal_width=1.0)
+
+
+@contextlib.asynccontextmanager
+async def serving(monkeypatch, estimator):
+    monkeypatch.setattr(svc, "model", estimator)
+    await svc.start_background_tasks()
+    try:
+        yield
+    finally:
+        svc.shutdown_event()
+        await asyncio.gather(svc._batcher_task, return_exceptions=True)
+
+
+def test_concurrent_requests_share_one_model_call(monkeypatch):
+    estimator = EchoModel()
+
+    async def scenario():
+        async with serving(monkeypatch, estimator):
+            return await asyncio.gather(*(svc.predict(features(i)) for i in range(10)))
+
+    results = asyncio.run(scenario())
+    assert [r["prediction"] for r in results] == list(range(10))
+    assert estimator.batch_sizes == [10]
+
+
+def test_non_finite_request_is_rejected_without_failing_its_batch(monkeypatch):
+    async def scenario():
+        async with serving(monkeypatch, EchoModel()):
+            return await asyncio.gather(
+                svc.predict(features(1e39)),
+                svc.predict(features(2.0)),
+                svc.predict(features(float("nan"))),
+                svc.predict(features(3.0)),
+                return_exceptions=True,
+            )
+
+    bad_inf, ok_2, bad_nan, ok_3 = asyncio.run(scenario())
+    assert isinstance(bad_inf, HTTPException) and bad_inf.status_code == 422
+    assert isinstance(bad_nan, HTTPException) and bad_nan.status_code == 422
+    assert ok_2 == {"prediction": 2}
+    assert ok_3 == {"prediction": 3}
+
+
+def test_failed_batch_fails_its_requests_and_batcher_keeps_serving(monkeypatch):
+    async def scenario():
+        async with serving(monkeypatch, EchoModel(fail_calls=1)):
+            failed = await asyncio.gather(
+                svc.predict(features(1.0)),
+                svc.predict(features(2.0)),
+                return_exceptions=True,
+            )
+            after = await svc.predict(features(4.0))
+            return failed, after
+
+    failed, after = asyncio.run(scenario())
+    assert all(isinstance(e, RuntimeError) for e in failed)
+    assert after == {"prediction": 4}
+
+
+def test_cancelled_request_does_not_stop_batcher(monkeypatch):
+    async def scenario():
+        async with serving(monkeypatch, EchoModel()):
+            abandoned = asyncio.create_task(svc.predict(features(1.0)))
+            await asyncio.sleep(0)
+            abandoned.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await abandoned
+            return await svc.predict(features(5.0))
+
+    assert asyncio.run(scenario()) == {"prediction": 5}
+
+
+def test_batch_endpoint_rejects_non_finite_rows(monkeypatch):
+    async def scenario():
+        async with serving(monkeypatch, EchoModel()):
+            with pytest.raises(HTTPException) as rejected:
+                await svc.predict_batch([features(1.0), features(-1e39)])
+            return rejected.value, await svc.predict_batch([features(1.0), features(2.0)])
+
+    rejected, ok = asyncio.run(scenario())
+    assert rejected.status_code == 422
+    assert ok == {"predictions": [1, 2]}
+
+
+class BlockingModel(EchoModel):
+    """
+    EchoModel whose predict calls wait at a barrier (or until released) before answering.
+    """
+    def __init__(self, barrier=None):
+        super().__init__()
+        self.barrier = barrier
+        self.release = threading.Event()
+
+    def predict(self, X):
+        if self.barrier is not None:
+            self.barrier.wait()
+        else:
+            self.release.wait(5)
+        return super().predict(X)
+
+
+def test_batches_run_concurrently_on_the_prediction_pool(monkeypatch):
+    # Each batch waits until the other one is running too, so serial dispatch would time out
+    estimator = BlockingModel(barrier=threading.Barrier(2, timeout=5))
+    monkeypatch.setattr(svc, "PREDICT_WORKERS", 2)
+
+    async def scenario():
+        async with serving(monkeypatch, estimator):
+            first = asyncio.create_task(svc.predict(features(1.0)))
+            await asyncio.sleep(0.05)
+            second = asyncio.create_task(svc.predict(features(2.0)))
+            return await asyncio.gather(first, second)
+
+    assert asyncio.run(scenario()) == [{"prediction": 1}, {"prediction": 2}]
+    assert estimator.batch_sizes == [1, 1]
+
+
+def test_full_queue_sheds_load_with_503(monkeypatch):
+    estimator = BlockingModel()
+    monkeypatch.setattr(svc, "PREDICT_WORKERS", 1)
+    monkeypatch.setattr(svc, "MAX_PENDING_PREDICTIONS", 2)
+
+    async def scenario():
+        async with serving(monkeypatch, estimator):
+            # The first request occupies the only worker, the next two fill the queue
+            running = [asyncio.create_task(svc.predict(features(1.0)))]
+            await asyncio.sleep(0.05)
+            running += [asyncio.create_task(svc.predict(features(v))) for v in (2.0, 3.0)]
+            await asyncio.sleep(0)
+            with pytest.raises(HTTPException) as shed:
+                await svc.predict(features(4.0))
+            estimator.release.set()
+            return shed.value, await asyncio.gather(*running)
+
+    shed, served = asyncio.run(scenario())
+    assert shed.status_code == 503
+    assert served == [{"prediction": 1}, {"prediction": 2}, {"prediction": 3}]
+
+
+class BrokenPool:
+    """
+    Stand-in for a process pool whose worker died.
+    """
+    def submit(self, fn, *args):
+        raise BrokenProcessPool("A child process terminated abruptly")
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def test_broken_prediction_process_pool_is_replaced(monkeypatch):
+    estimator = EchoModel()
+    pools = iter([BrokenPool(), ThreadPoolExecutor(max_workers=1)])
+    monkeypatch.setattr(svc, "PREDICT_PROCESSES", 1)
+    monkeypatch.setattr(svc, "_create_predict_process_pool", lambda: next(pools))
+    monkeypatch.setattr(svc, "_load_sklearn_model", lambda model_uri: estimator)
+    monkeypatch.setattr(svc, "current_model_uri", "runs:/test/model")
+
+    async def scenario():
+        async with serving(monkeypatch, estimator):
+            first = await svc.predict(features(1.0))
+            return first, await svc.predict(features(2.0)), svc._predict_process_pool
+
+    first, second, pool = asyncio.run(scenario())
+    assert (first, second) == ({"prediction": 1}, {"prediction": 2})
+    assert isinstance(pool, ThreadPoolExecutor)
+
+
+def test_predict_worker_preload_failure_does_not_raise(monkeypatch):
+    def fail(model_uri):
+        raise OSError("artifact store unreachable")
+
+    monkeypatch.setattr(svc, "_load_sklearn_model", fail)
+    svc._init_predict_worker("runs:/test/model")
+
+
+def test_batch_endpoint_rejects_too_many_rows(monkeypatch):
+    monkeypatch.setattr(svc, "MAX_BATCH_ROWS", 2)
+    monkeypatch.setattr(svc, "MAX_BATCH_BODY_BYTES", 10_000)
+    row = {"sepal_length": 1.0, "sepal_width": 1.0, "petal_length": 1.0, "petal_width": 1.0}
+
+    with TestClient(svc.app) as client:
+        monkeypatch.setattr(svc, "model", EchoModel())
+        ok = client.post("/predict/batch", json=[row, row])
+        too_many = client.post("/predict/batch", json=[row, row, row])
+        too_large = client.post("/predict/batch", content=b"[" + b" " * 10_001 + b"]")
+        # Chunked, so there is no Content-Length to reject it by
+        too_large_streamed = client.post("/predict/batch", content=iter([b"[", b" " * 6_000, b" " * 6_000, b"]"]))
+
+    assert ok.status_code == 200
+    assert too_many.status_code == 413
+    assert "2 rows" in too_many.json()["detail"]
+    assert too_large.status_code == 413
+    assert "10000 bytes" in too_large.json()["detail"]
+    assert too_large_streamed.status_code == 413
+
+
+def test_batch_requests_share_the_prediction_workers_and_shed_load(monkeypatch):
+    estimator = BlockingModel()
+    monkeypatch.setattr(svc, "PREDICT_WORKERS", 1)
+    monkeypatch.setattr(svc, "MAX_PENDING_BATCH_REQUESTS", 1)
+
+    async def scenario():
+        async with serving(monkeypatch, estimator):
+            # The first call occupies the only worker, the second waits for it
+            running = [asyncio.create_task(svc.predict_batch([features(1.0)]))]
+            await asyncio.sleep(0.05)
+            running.append(asyncio.create_task(svc.predict_batch([features(2.0)])))
+            await asyncio.sleep(0)
+            with pytest.raises(HTTPException) as shed:
+                await svc.predict_batch([features(3.0)])
+            estimator.release.set()
+            return shed.value, await asyncio.gather(*running)
+
+    shed, served = asyncio.run(scenario())
+    assert shed.status_code == 503
+    assert served == [{"predictions": [1]}, {"predictions": [2]}]
+    assert estimator.batch_sizes == [1, 1]
@@ -0,0 +1,71 @@
+# test_model_loading.py
+import asyncio
+import os
+from types import SimpleNamespace
+
+import inference_service as svc
+
+
+class FakeRegistry:
+    """
+    MlflowClient stand-in whose production alias points at a fixed model version.
+    """
+    def __init__(self, version, source):
+        self.model_version = SimpleNamespace(version=version, source=source, run_id="run")
+
+    def get_model_version_by_alias(self, name, alias):
+        return self.model_version
+
+
+def test_registry_model_is_loaded_and_cached_by_artifact_source(monkeypatch):
+    for name in ("model", "current_model_version", "current_model_uri"):
+        monkeypatch.setattr(svc, name, None)
+    loaded_uris = []
+    monkeypatch.setattr(svc, "_load_sklearn_model", lambda model_uri: loaded_uris.append(model_uri) or object())
+
+    # The same version number before and after the model was deleted and re-registered
+    for source in ("s3://mlflow/1/run-a/artifacts/model", "s3://mlflow/1/run-b/artifacts/model"):
+        monkeypatch.setattr(svc, "_client", lambda: FakeRegistry("1", source))
+        assert svc.load_model_from_mlflow()
+
+    assert loaded_uris == ["s3://mlflow/1/run-a/artifacts/model", "s3://mlflow/1/run-b/artifacts/model"]
+    assert svc.current_model_uri == "s3://mlflow/1/run-b/artifacts/model"
+    assert svc.current_model_version == "1"
+
+
+def test_background_loader_keeps_retrying_after_unexpected_errors(monkeypatch):
+    attempts = []
+
+    def flaky_load():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            raise EOFError("Ran out of input")  # e.g. a truncated pickle
+        svc.model = object()
+        return True
+
+    monkeypatch.setattr(svc, "model", None)
+    monkeypatch.setattr(svc, "MODEL_RETRY_INITIAL_SECONDS", 0)
+    monkeypatch.setattr(svc, "load_model_from_mlflow", flaky_load)
+
+    asyncio.run(asyncio.wait_for(svc._retry_model_load(), timeout=5))
+    assert attempts == [0, 1]
+    assert svc.model is not None
+
+
+def test_model_cache_keeps_only_the_most_recently_used_files(monkeypatch, tmp_path):
+    monkeypatch.setattr(svc, "MODEL_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(svc, "MODEL_CACHE_MAX_FILES", 2)
+    monkeypatch.setattr(svc.mlflow.sklearn, "load_model", lambda model_uri: {"uri": model_uri})
+    stale = tmp_path / "models_iris-classifier_1-sklearn1.0.joblib"  # Pre-existing file with an old key
+    stale.write_bytes(b"")
+    os.utime(stale, (0, 0))
+
+    for i, uri in enumerate(("runs:/a/model", "runs:/b/model", "runs:/c/model")):
+        svc._fetch_sklearn_model(uri)
+        os.utime(svc._model_cache_path(uri), (i + 1, i + 1))
+    # Reading a cached model counts as a use
+    assert svc._fetch_sklearn_model("runs:/b/model") == {"uri": "runs:/b/model"}
+    svc._fetch_sklearn_model("runs:/d/model")
+
+    kept = {path.name for path in tmp_path.iterdir()}
+    assert kept == {os.path.basename(svc._model_cache_path(uri)) for uri in ("runs:/b/model", "runs:/d/model")}
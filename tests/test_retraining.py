@@ -0,0 +1,161 @@
+# test_retraining.py
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+from fastapi import BackgroundTasks, HTTPException
+from fastapi.testclient import TestClient
+
+import inference_service as svc
+
+
+@pytest.fixture
+def fake_compose(monkeypatch, tmp_path):
+    """
+    Replace the docker compose command with a Python script; returns the started processes.
+    """
+    real_popen = subprocess.Popen
+    started = []
+
+    def run(script):
+        def popen(cmd, **kwargs):
+            kwargs["cwd"] = tmp_path
+            process = real_popen([sys.executable, "-c", script], **kwargs)
+            started.append(process)
+            return process
+        monkeypatch.setattr(svc.subprocess, "Popen", popen)
+        return started
+
+    return run
+
+
+def test_non_utf8_pipeline_output_is_streamed(fake_compose, caplog):
+    fake_compose(r"import sys; sys.stdout.buffer.write(b'step ok\n\xff\xfe binary noise\ndone\n')")
+
+    with caplog.at_level("INFO", logger="inference_service"):
+        svc._retrain_subprocess()
+
+    assert "[pipeline-runner] done" in caplog.text
+    assert "Pipeline completed successfully" in caplog.text
+
+
+def test_pipeline_is_killed_when_streaming_fails(fake_compose, monkeypatch):
+    started = fake_compose("import time; print('started', flush=True); time.sleep(60)")
+
+    def broken_follow(lines, kill):
+        raise RuntimeError("log handler failed")
+
+    monkeypatch.setattr(svc, "_follow_pipeline_output", broken_follow)
+    with pytest.raises(RuntimeError):
+        svc._retrain_subprocess()
+
+    assert started[0].poll() is not None
+
+
+@pytest.mark.parametrize("pipeline_succeeded, second_status", [(True, 429), (False, 200)])
+def test_retrain_debounce_starts_after_a_successful_retrain(monkeypatch, pipeline_succeeded, second_status):
+    monkeypatch.setattr(svc, "RETRAIN_MODE", "subprocess")
+    monkeypatch.setattr(svc, "_retrain_subprocess", lambda: pipeline_succeeded)
+    monkeypatch.setattr(svc, "load_model_from_mlflow", lambda: False)
+    monkeypatch.setattr(svc, "_last_retrain_success", float("-inf"))
+    monkeypatch.setattr(svc, "_retrain_started_at", None)
+
+    with TestClient(svc.app) as client:
+        # The background retrain runs to completion before the response is returned
+        first = client.post("/retrain")
+        second = client.post("/retrain")
+
+    assert first.status_code == 200
+    assert second.status_code == second_status
+
+
+def test_retrain_that_never_ran_stops_blocking_after_the_stale_window(monkeypatch):
+    monkeypatch.setattr(svc, "_last_retrain_success", float("-inf"))
+    monkeypatch.setattr(svc, "_retrain_started_at", None)
+    clock = [1000.0]
+    monkeypatch.setattr(svc.time, "monotonic", lambda: clock[0])
+
+    # The background task is scheduled but never runs, e.g. because the response failed
+    svc.retrain_model(BackgroundTasks())
+    with pytest.raises(HTTPException) as running:
+        svc.retrain_model(BackgroundTasks())
+    assert running.value.status_code == 409
+
+    clock[0] += svc.RETRAIN_STALE_SECONDS
+    tasks = BackgroundTasks()
+    assert svc.retrain_model(tasks)["status"] == "retraining_started"
+    assert tasks.tasks[0].args == (clock[0],)
+
+
+fake_docker = SimpleNamespace(errors=SimpleNamespace(ImageNotFound=type("ImageNotFound", (Exception,), {})))
+
+
+class FakeContainer:
+    def __init__(self, mounts=()):
+        self.attrs = {"Mounts": list(mounts)}
+        self.removed = False
+
+    def logs(self, stream, follow):
+        return iter([b"training\n", b"done\n"])
+
+    def kill(self):
+        pass
+
+    def wait(self):
+        return {"StatusCode": 0}
+
+    def remove(self, force):
+        self.removed = True
+
+
+class FakeDockerClient:
+    """
+    Docker SDK client stand-in that records the containers it is asked to run.
+    """
+    def __init__(self, own_container, image_exists=True):
+        self.own_container = own_container
+        self.image_exists = image_exists
+        self.runs = []
+        self.started = FakeContainer()
+        self.containers = SimpleNamespace(get=lambda name: self.own_container, run=self.run)
+        self.images = SimpleNamespace(get=self.get_image)
+
+    def get_image(self, name):
+        if not self.image_exists:
+            raise fake_docker.errors.ImageNotFound(name)
+
+    def run(self, image, **kwargs):
+        self.runs.append((image, kwargs))
+        return self.started
+
+
+def test_docker_retrain_forwards_environment_and_data_volume(monkeypatch):
+    own = FakeContainer(mounts=[
+        {"Type": "bind", "Source": "/srv/project/data-file", "Destination": "/app/data-file"},
+        {"Type": "volume", "Name": "model_cache", "Destination": "/app/.model_cache"},
+    ])
+    client = FakeDockerClient(own)
+    monkeypatch.setitem(sys.modules, "docker", fake_docker)
+    monkeypatch.setattr(svc, "_docker_client", lambda: client)
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "from-compose")
+    monkeypatch.delenv("ZENML_STORE_API_KEY", raising=False)
+
+    assert svc._retrain_docker()
+
+    [(image, kwargs)] = client.runs
+    assert image == svc.PIPELINE_RUNNER_IMAGE
+    assert kwargs["environment"]["AWS_ACCESS_KEY_ID"] == "from-compose"
+    assert "ZENML_STORE_API_KEY" not in kwargs["environment"]
+    assert kwargs["volumes"] == {"/srv/project/data-file": {"bind": "/app/data-file", "mode": "rw"}}
+    assert client.started.removed
+
+
+def test_docker_retrain_requires_a_prebuilt_image(monkeypatch):
+    client = FakeDockerClient(FakeContainer(), image_exists=False)
+    monkeypatch.setitem(sys.modules, "docker", fake_docker)
+    monkeypatch.setattr(svc, "_docker_client", lambda: client)
+
+    with pytest.raises(RuntimeError, match="docker compose --profile pipeline build pipeline-runner"):
+        svc._retrain_docker()
+    assert client.runs == []